@@ -1,26 +1,146 @@
 """Ddownloader class for downloading files from a given URL to a local file path."""
 
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Mapping, Tuple, Union
 
-import requests
 from loguru import logger
 
+if TYPE_CHECKING:
+    # `requests` (with urllib3, idna, certifi, ...) takes a while to import,
+    # it is imported only when something is actually downloaded
+    import requests
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+# cached files validated more recently than this are used without any network access
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+
+VALIDATORS_SUFFIX = ".etag"
+SHA256_SUFFIX = ".sha256"
+PARTIAL_SUFFIX = ".part"
+
+# already compressed, transport compression would only waste CPU on both ends
+COMPRESSED_SUFFIXES = frozenset((".zip", ".whl", ".gz", ".tgz", ".bz2", ".xz", ".7z"))
+
+
+def _make_session() -> "requests.Session":
+    """Create a session with connection pooling and retries.
+
+    Returns:
+        requests.Session: The session shared by all downloads.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# shared between all downloads to reuse TCP/TLS connections (keep-alive)
+_SESSION: Union["requests.Session", None] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """Get the shared session, creating it on first use.
+
+    Returns:
+        requests.Session: The session shared by all downloads.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = _make_session()
+        return _SESSION
+
+
+def _open_sequential(file_path: Path, append: bool, buffering: int) -> BinaryIO:
+    """Open a file for sequential writing.
+
+    Hints the OS cache manager about the access pattern: `O_SEQUENTIAL` on Windows,
+    `posix_fadvise(POSIX_FADV_SEQUENTIAL)` where available.
+
+    Args:
+        file_path (Path): The path to the file.
+        append (bool): Append to the file instead of truncating it.
+        buffering (int): The buffer size.
+
+    Returns:
+        BinaryIO: The opened file.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+    flags |= getattr(os, "O_SEQUENTIAL", 0) | getattr(os, "O_BINARY", 0)
+    fd = os.open(file_path, flags, 0o644)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return os.fdopen(fd, "ab" if append else "wb", buffering=buffering)
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+def file_sha256(file_path: Path) -> str:
+    """Compute the SHA256 digest of a file.
+
+    Args:
+        file_path (Path): The path to the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    with open(file_path, "rb") as file:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(file, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        while chunk := file.read(DEFAULT_CHUNK_SIZE):
+            digest.update(chunk)
+        return digest.hexdigest()
+
 
 class Dwwnloader:
     """Class for downloading files from a given URL to a local file path."""
 
-    def __init__(self, download_dir_path: Path):
+    def __init__(self, download_dir_path: Path, max_age: float = DEFAULT_MAX_AGE):
         """Initialize the Downloader object.
 
         Args:
             download_dir_path (Path): The path to the directory
             where downloaded files will be saved.
+            max_age (float, optional): For how many seconds a cached file stays
+            fresh after it was downloaded or revalidated. Use 0 to always revalidate.
+            Defaults to 1 day.
         """
         if not download_dir_path.exists() or not download_dir_path.is_dir():
             raise FileNotFoundError(f"{download_dir_path} is not found.")
         self._download_dir_path = download_dir_path
+        self._max_age = max_age
+        self._cancelled = threading.Event()
 
-    def download(self, url: str, file: str) -> Path:
+    def download(
+        self,
+        url: str,
+        file: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        expected_sha256: Union[str, None] = None,
+    ) -> Path:
         """Download a file from a given URL and save it to a local file path.
 
         It will check if the file is already downloaded and cached. If so, it will
@@ -29,29 +149,259 @@ class Dwwnloader:
         Args:
             url (str): The URL of the file to download.
             file (str): The name of the file to save the downloaded file to.
+            chunk_size (int, optional): The size of each chunk to download.
+            Defaults to 1 MiB.
+            expected_sha256 (Union[str, None], optional): The expected SHA256 hex
+            digest of the file. If given, a cached file matching it is used without
+            any network access, and a downloaded file not matching it is rejected.
+            Defaults to None.
+
+        Raises:
+            RuntimeError: If the downloaded file does not match `expected_sha256`.
 
         Returns:
             Path: The local file path of the downloaded file.
         """
-        logger.debug(f"Downloading {url} to {file}")
+        # debug messages here use loguru's lazy formatting: arguments are
+        # formatted only if a handler accepts the message
+        logger.debug("Downloading {} to {}", url, file)
         file_path = self._download_dir_path / file
         if file_path.exists() and file_path.is_file():  # cached
-            logger.debug(f"{file_path} is cached.")
-            return file_path
-        logger.debug(f"{file_path} is not cached. Downloading...")
-        self._download_file(url, file_path)
+            if expected_sha256 is not None:
+                if self._sha256(file_path) == expected_sha256.lower():
+                    logger.debug("{} is cached and verified.", file_path)
+                    return file_path
+                logger.warning(f"{file_path} does not match its SHA256, downloading again...")
+                file_path.unlink()
+                self._validators_file_path(file_path).unlink(missing_ok=True)
+            else:
+                validators = self._read_validators(file_path)
+                if not validators or self._is_fresh(file_path):
+                    logger.debug("{} is cached.", file_path)
+                    return file_path
+                logger.debug("{} is cached. Revalidating...", file_path)
+                import requests
+
+                try:
+                    self._download_file(
+                        url, file_path, chunk_size=chunk_size, validators=validators
+                    )
+                except requests.RequestException as e:
+                    # e.g. no network, a timeout or a server error (5xx)
+                    logger.warning(f"Can not revalidate {file_path}, using cached file: {e}")
+                return file_path
+        else:
+            logger.debug("{} is not cached. Downloading...", file_path)
+        self._download_file(url, file_path, chunk_size=chunk_size)
+        if expected_sha256 is not None and self._sha256(file_path) != expected_sha256.lower():
+            file_path.unlink()
+            raise RuntimeError(f"SHA256 of {url} does not match {expected_sha256}.")
         return file_path
 
-    def _download_file(self, url: str, local_file_path: Path, chunk_size: int = 128) -> None:
+    def _is_fresh(self, file_path: Path) -> bool:
+        """Check if a cached file was downloaded or revalidated less than `max_age` ago.
+
+        Args:
+            file_path (Path): The path to the downloaded file.
+
+        Returns:
+            bool: True if the file can be used without revalidation.
+        """
+        try:
+            validated_at = self._validators_file_path(file_path).stat().st_mtime
+        except OSError:
+            return False
+        return time.time() - validated_at < self._max_age
+
+    def _sha256(self, file_path: Path) -> str:
+        """Get the SHA256 digest of a downloaded file.
+
+        The digest is kept in a `.sha256` sidecar file, which is trusted as long as
+        it is newer than the file itself.
+
+        Args:
+            file_path (Path): The path to the downloaded file.
+
+        Returns:
+            str: The hex digest.
+        """
+        sha256_file_path = file_path.with_name(file_path.name + SHA256_SUFFIX)
+        try:
+            if sha256_file_path.stat().st_mtime_ns >= file_path.stat().st_mtime_ns:
+                return sha256_file_path.read_text(encoding="utf8").split()[0]
+        except (OSError, IndexError):
+            pass
+        digest = file_sha256(file_path)
+        sha256_file_path.write_text(f"{digest}  {file_path.name}\n", encoding="utf8")
+        return digest
+
+    def download_many(self, items: Iterable[Tuple[str, str]]) -> List[Path]:
+        """Download several files concurrently.
+
+        Downloads run in a thread pool sized to the shared session's connection pool.
+        If interrupted, pending downloads are cancelled and running ones are stopped.
+
+        Args:
+            items (Iterable[Tuple[str, str]]): Pairs of (url, file) as accepted by
+                `download()`.
+
+        Returns:
+            List[Path]: The local file paths of the downloaded files,
+                in the same order as `items`.
+        """
+        items = list(items)
+        file_paths: List[Path] = [Path()] * len(items)
+        try:
+            with ThreadPoolExecutor(max_workers=POOL_MAXSIZE) as executor:
+                futures = {
+                    executor.submit(self.download, url, file): i
+                    for i, (url, file) in enumerate(items)
+                }
+                try:
+                    for future in as_completed(futures):
+                        file_paths[futures[future]] = future.result()
+                except BaseException:
+                    self._cancelled.set()
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            # all downloads have stopped when the executor is shut down,
+            # later downloads with this instance must not see the cancellation
+            self._cancelled.clear()
+        return file_paths
+
+    def cancel(self) -> None:
+        """Stop downloads running in `download_many()`.
+
+        Can be called from any thread. Running downloads raise `RuntimeError`,
+        pending ones are not started.
+        """
+        self._cancelled.set()
+
+    def _download_file(
+        self,
+        url: str,
+        local_file_path: Path,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        validators: Union[Dict[str, str], None] = None,
+    ) -> None:
         """Download a file from a given URL and save it to a local file path.
 
+        The file is downloaded to a `.part` file first, which is renamed to
+        `local_file_path` only when complete. If a `.part` file is left over from
+        an interrupted download, only the missing tail is requested.
+
         Args:
             url (str): The URL of the file to download.
             local_file_path (Path): The local file path to save the downloaded file to.
             chunk_size (int, optional): The size of each chunk to download.
-            Defaults to 128.
+            Defaults to 1 MiB.
+            validators (Union[Dict[str, str], None], optional): `ETag` and
+            `Last-Modified` values of the cached file. If given, the request is
+            conditional and the file is left untouched when it is not modified.
+            Defaults to None.
+
+        Raises:
+            RuntimeError: If the download was cancelled or is incomplete.
         """
-        resp = requests.get(url, stream=True)
-        with open(local_file_path, "wb") as file:
-            for chunk in resp.iter_content(chunk_size=chunk_size):
-                file.write(chunk)
+        part_file_path = local_file_path.with_name(local_file_path.name + PARTIAL_SUFFIX)
+        headers = {"Accept-Encoding": "gzip, deflate"}
+        if local_file_path.suffix.lower() in COMPRESSED_SUFFIXES:
+            headers["Accept-Encoding"] = "identity"
+        if validators:
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+        offset = part_file_path.stat().st_size if part_file_path.is_file() else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # the offset counts decoded bytes, so the tail must not be encoded
+            headers["Accept-Encoding"] = "identity"
+            part_validators = self._read_validators(part_file_path)
+            # resume only if the remote file has not changed since
+            if_range = part_validators.get("ETag") or part_validators.get("Last-Modified")
+            if if_range:
+                headers["If-Range"] = if_range
+        resp = _get_session().get(url, stream=True, timeout=DEFAULT_TIMEOUT, headers=headers)
+        with resp:
+            if resp.status_code == 304:
+                logger.debug("{} is not modified.", local_file_path)
+                # restart the freshness period
+                self._validators_file_path(local_file_path).touch()
+                return
+            if resp.status_code == 416:  # range not satisfiable, start over
+                logger.debug("Can not resume download of {}, restarting...", url)
+                part_file_path.unlink()
+                return self._download_file(url, local_file_path, chunk_size, validators)
+            resp.raise_for_status()
+            append = resp.status_code == 206
+            if append:
+                logger.debug("Resuming download of {} from byte {}", url, offset)
+            else:
+                offset = 0
+            self._write_validators(part_file_path, resp.headers)
+            # Content-Length is the size on the wire, it is the file size only
+            # if the body is not encoded
+            content_length: Union[int, None] = None
+            if "Content-Length" in resp.headers and "Content-Encoding" not in resp.headers:
+                content_length = int(resp.headers["Content-Length"])
+            # read the raw stream directly instead of going through `iter_content`
+            # (same loop as `shutil.copyfileobj`, plus a cancellation check)
+            resp.raw.decode_content = True
+            read = resp.raw.read
+            with _open_sequential(part_file_path, append, buffering=chunk_size) as file:
+                presized = not append and bool(content_length)
+                if presized:
+                    # let the file system allocate the whole file at once
+                    file.truncate(content_length)
+                try:
+                    while chunk := read(chunk_size):
+                        if self._cancelled.is_set():
+                            raise RuntimeError(f"Download of {url} was cancelled.")
+                        file.write(chunk)
+                finally:
+                    if presized:
+                        # drop the preallocated tail that was not written (if any),
+                        # so the `.part` file size stays the resume offset
+                        file.truncate()
+            if content_length is not None:
+                expected_size = offset + content_length
+                actual_size = part_file_path.stat().st_size
+                if actual_size != expected_size:
+                    raise RuntimeError(
+                        f"Download of {url} is incomplete: "
+                        f"got {actual_size} of {expected_size} bytes."
+                    )
+        os.replace(part_file_path, local_file_path)
+        part_validators_file_path = self._validators_file_path(part_file_path)
+        validators_file_path = self._validators_file_path(local_file_path)
+        if part_validators_file_path.exists():
+            os.replace(part_validators_file_path, validators_file_path)
+        elif validators_file_path.exists():
+            validators_file_path.unlink()
+
+    @staticmethod
+    def _validators_file_path(local_file_path: Path) -> Path:
+        return local_file_path.with_name(local_file_path.name + VALIDATORS_SUFFIX)
+
+    def _read_validators(self, local_file_path: Path) -> Dict[str, str]:
+        validators_file_path = self._validators_file_path(local_file_path)
+        if not validators_file_path.is_file():
+            return {}
+        try:
+            return json.loads(validators_file_path.read_text(encoding="utf8"))
+        except ValueError:
+            logger.warning(f"Ignoring corrupted {validators_file_path}")
+            return {}
+
+    def _write_validators(self, local_file_path: Path, headers: Mapping[str, str]) -> None:
+        validators = {
+            name: headers[name] for name in ("ETag", "Last-Modified") if headers.get(name)
+        }
+        validators_file_path = self._validators_file_path(local_file_path)
+        if validators:
+            validators_file_path.write_text(json.dumps(validators), encoding="utf8")
+        elif validators_file_path.exists():
+            validators_file_path.unlink()
@@ -4,9 +4,13 @@ Functions:
 - generate_exe: Generates an executable file from a command string and an optional icon file.
 - add_icon_to_exe: Adds an icon file to an existing executable file.
 """
+import os
 import struct
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, BinaryIO, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
 import win32api
 from loguru import logger
@@ -21,6 +25,25 @@ MAX_CMD_LENGTH = 259
 REPLACE_SIGNATURE = (b"X" * MAX_CMD_LENGTH) + b"1"
 
 
+@lru_cache(maxsize=1)
+def _exe_template() -> Tuple[bytes, int]:
+    """Read the launcher template and find where the command goes.
+
+    The template never changes, so it is read and searched once per process.
+
+    Raises:
+        RuntimeError: If the command signature is not found in the template.
+
+    Returns:
+        Tuple[bytes, int]: The template and the offset of the command signature in it.
+    """
+    template = EXE_TEMPLATE_FILE.read_bytes()
+    offset = template.find(REPLACE_SIGNATURE)
+    if offset == -1:
+        raise RuntimeError(f"Command signature not found in {EXE_TEMPLATE_FILE}")
+    return template, offset
+
+
 def generate_exe(
     target: Path,
     command: str,
@@ -37,30 +60,32 @@ def generate_exe(
         show_console (bool, optional): Whether to show the console window
             when the executable is run. Defaults to True.
     """
-    target = target.absolute().resolve()
+    target = Path(target).absolute().resolve()
     if target == EXE_TEMPLATE_FILE:
         raise RuntimeError(
             "Cannot overwrite the source EXE_TEMPLATE_FILE file! "
             "Pick a different target executable name."
         )
-    with open(EXE_TEMPLATE_FILE, "rb") as f:
-        data = f.read()
-    if len(command) > MAX_CMD_LENGTH:
+    template, offset = _exe_template()
+    data = bytearray(template)
+    command_bytes = command.encode("ascii")
+    if len(command_bytes) > MAX_CMD_LENGTH:
         logger.warning(
-            f"Length of command is {len(command)} "
-            "and is longer than {MAX_CMD_LENGTH} characters. "
+            f"Length of command is {len(command_bytes)} "
+            f"and is longer than {MAX_CMD_LENGTH} characters. "
             f"Will be truncated."
         )
-        command = command[:MAX_CMD_LENGTH]
-        logger.debug(f"Truncated command: {command}")
-    else:
-        command = command + "\0" * (MAX_CMD_LENGTH - len(command))
-    assert len(command) == MAX_CMD_LENGTH
-    msg = command + ("1" if show_console else "0")
-    byte_encoded_string = msg.encode("ascii")
-    data = data.replace(REPLACE_SIGNATURE, byte_encoded_string)
-    with open(target, "wb") as f:
+        command_bytes = command_bytes[:MAX_CMD_LENGTH]
+        logger.debug(f"Truncated command: {command_bytes.decode('ascii')}")
+    payload = command_bytes.ljust(MAX_CMD_LENGTH, b"\0") + (b"1" if show_console else b"0")
+    assert len(payload) == len(REPLACE_SIGNATURE)
+    data[offset : offset + len(REPLACE_SIGNATURE)] = payload
+    # write to a temporary file first so that a failed write never leaves
+    # a broken executable behind
+    temp_target = target.with_name(target.name + ".tmp")
+    with open(temp_target, "wb") as f:
         f.write(data)
+    os.replace(temp_target, target)
     if icon_file is not None:
         icon_file = Path(icon_file).absolute().resolve()
         add_icon_to_exe(target_exe_file=target, source_icon_file=icon_file)
@@ -72,114 +97,61 @@ def generate_exe(
 
 # Documentation on struct specifications and their use can be found here:
 # https://web.archive.org/web/20160531004250/https://msdn.microsoft.com/en-us/library/ms997538.aspx
-ICONDIRHEADER = (("idReserved", "idType", "idCount"), "hhh")
-ICONDIRENTRY = (
-    (
-        "bWidth",
-        "bHeight",
-        "bColorCount",
-        "bReserved",
-        "wPlanes",
-        "wBitCount",
-        "dwBytesInRes",
-        "dwImageOffset",
-    ),
-    "bbbbhhii",
-)
-GRPICONDIRENTRY = (
-    (
-        "bWidth",
-        "bHeight",
-        "bColorCount",
-        "bReserved",
-        "wPlanes",
-        "wBitCount",
-        "dwBytesInRes",
-        "nID",
-    ),
-    "bbbbhhih",
-)
+ICONDIRHEADER = struct.Struct("hhh")
+ICONDIRENTRY = struct.Struct("bbbbhhii")
+GRPICONDIRENTRY = struct.Struct("bbbbhhih")
 RT_ICON = 3
 RT_GROUP_ICON = 14
 
+IconDirHeader = namedtuple("IconDirHeader", "idReserved idType idCount")
+IconDirEntry = namedtuple(
+    "IconDirEntry",
+    "bWidth bHeight bColorCount bReserved wPlanes wBitCount dwBytesInRes dwImageOffset",
+)
 
-class DataStruct(object):
-    """General class for handling data structures within a file."""
-
-    def __init__(
-        self,
-        dtype: Tuple[Tuple[str, ...], str],
-        input_stream: Optional[BinaryIO] = None,
-    ):
-        """Initialize a new instance of the DataStruct class.
 
-        Args:
-            dtype: A tuple of the form (field_names, data_types), where
-                field_names is a tuple of strings representing the names of the fields
-                in the data structure, and data_types is a string representing the
-                data types of the fields in the data structure.
-            input_stream: An optional input stream from which to read the data
-                structure. If None, the data structure will be initialized to all
-                zeros.
+@dataclass(slots=True)
+class GrpIconDirEntry:
+    """Icon directory entry as stored in a RT_GROUP_ICON resource."""
 
-        Returns:
-            - None.
-        """
-        self.__dict__["_field_names"] = dtype[0]
-        self._data_types = dtype[1]
-        assert len(self._field_names) == len(self._data_types)
-        self._indices = {}
-        for i, name in enumerate(self._field_names):
-            self._indices[name] = i
-        self._size = struct.calcsize(self._data_types)
-        self._data = list(
-            struct.unpack(
-                self._data_types,
-                bytearray(self._size) if input_stream is None else input_stream.read(self._size),
-            )
-        )
+    bWidth: int
+    bHeight: int
+    bColorCount: int
+    bReserved: int
+    wPlanes: int
+    wBitCount: int
+    dwBytesInRes: int
+    nID: int
 
-    def __getattr__(self, name: str) -> Any:
-        """Retrieve the value of the specified attribute.
+    @classmethod
+    def from_dir_entry(cls, dir_entry: IconDirEntry, nID: int) -> "GrpIconDirEntry":
+        """Create a group icon entry from an icon file directory entry.
 
         Args:
-            name: A string representing the name of the attribute to retrieve.
+            dir_entry: The directory entry read from the icon file.
+            nID: The ID of the RT_ICON resource holding the image.
 
         Returns:
-            The value of the specified attribute, if it exists.
-
-        Raises:
-            AttributeError: If the specified attribute does not exist.
+            The group icon entry.
         """
-        if name in self._field_names:
-            return self._data[self._indices[name]]
-        return self.__dict__[name]
-
-    def __setattr__(self, name: str, value: Any):
-        """Set the value of the specified attribute.
+        return cls(*dir_entry[:-1], nID=nID)  # all fields but dwImageOffset
 
-        Args:
-            name: A string representing the name of the attribute to set.
-            value: The value to set the attribute to.
+    def pack(self) -> bytes:
+        """Pack the entry into its binary representation.
 
         Returns:
-            None.
-
-        Raises:
-            AttributeError: If the specified attribute does not exist.
+            The packed entry.
         """
-        if name in self._field_names:
-            self._data[self._indices[name]] = value
-        else:
-            self.__dict__[name] = value
-
-    def _get_data(self) -> bytes:
-        return struct.pack(self._data_types, *self._data)
-
-    def _copy(self, data_struct: "DataStruct"):
-        for field_name in data_struct._field_names:
-            if field_name in self._field_names:
-                setattr(self, field_name, getattr(data_struct, field_name))
+        return GRPICONDIRENTRY.pack(
+            self.bWidth,
+            self.bHeight,
+            self.bColorCount,
+            self.bReserved,
+            self.wPlanes,
+            self.wBitCount,
+            self.dwBytesInRes,
+            self.nID,
+        )
 
 
 class Icon(object):
@@ -194,24 +166,26 @@ class Icon(object):
         Returns:
             None.
         """
-        with open(str(file_name), "rb") as f:
-            self._header = DataStruct(dtype=ICONDIRHEADER, input_stream=f)
-            self._dir_entries = [
-                DataStruct(dtype=ICONDIRENTRY, input_stream=f) for _ in range(self._header.idCount)
-            ]
-            self._icon_data: List[bytes] = []
-            for entry in self._dir_entries:
-                f.seek(entry.dwImageOffset, 0)
-                self._icon_data.append(f.read(entry.dwBytesInRes))
+        raw = Path(file_name).read_bytes()
+        self._header = IconDirHeader._make(ICONDIRHEADER.unpack_from(raw, 0))
+        offset = ICONDIRHEADER.size
+        self._dir_entries: List[IconDirEntry] = []
+        for _ in range(self._header.idCount):
+            self._dir_entries.append(IconDirEntry._make(ICONDIRENTRY.unpack_from(raw, offset)))
+            offset += ICONDIRENTRY.size
+        # slice images out of the file without intermediate copies, walking the
+        # buffer in file order; bytes are only materialized for the Win32 API
+        view = memoryview(raw)
+        self._icon_data: List[bytes] = [b""] * len(self._dir_entries)
+        for i, entry in sorted(enumerate(self._dir_entries), key=lambda e: e[1].dwImageOffset):
+            start = entry.dwImageOffset
+            self._icon_data[i] = view[start : start + entry.dwBytesInRes].tobytes()
 
     def _get_header_and_group_icon_dir_data(self) -> bytes:
-        data = self._header._get_data()
+        data = bytearray(ICONDIRHEADER.pack(*self._header))
         for i, dir_entry in enumerate(self._dir_entries):
-            icon_dir_entry = DataStruct(dtype=GRPICONDIRENTRY)
-            icon_dir_entry._copy(data_struct=dir_entry)
-            icon_dir_entry.nID = i + 1
-            data += icon_dir_entry._get_data()
-        return data
+            data += GrpIconDirEntry.from_dir_entry(dir_entry, nID=i + 1).pack()
+        return bytes(data)
 
     def _get_icon_data(self) -> List[bytes]:
         return self._icon_data
@@ -233,13 +207,14 @@ def add_icon_to_exe(source_icon_file: Path, target_exe_file: Path):
     """
     logger.debug(f"Adding icon to {target_exe_file!r}")
     logger.debug(f"Icon file: {source_icon_file!r}")
-    target_exe_file = target_exe_file.absolute().resolve()
+    # paths are already resolved by `generate_exe()`
+    target_exe_file = Path(target_exe_file)
     if not target_exe_file.is_file():
         raise FileNotFoundError(
             "The target executable file could not be found or is not a valid file: "
             f"{target_exe_file}"
         )
-    source_icon_file = source_icon_file.absolute().resolve()
+    source_icon_file = Path(source_icon_file)
     if not source_icon_file.is_file():
         raise FileNotFoundError(
             "The icon file could not be found or is not a valid file: " f"{source_icon_file}"
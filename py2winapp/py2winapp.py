@@ -7,21 +7,29 @@ Todo:
 - x86 Python support
 
 """
+import fnmatch
+import glob
+import hashlib
 import os
 import re
 import shutil
+import stat
 import subprocess
 import sys
+import tempfile
+import time
 import zipfile
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Union
+from typing import Callable, FrozenSet, Iterable, List, Set, Tuple, Union
 
 from loguru import logger
 from pip_requirements_parser import RequirementsFile
 from slugify import slugify
 
-from py2winapp.downloader import Dwwnloader
+from py2winapp.downloader import DEFAULT_MAX_AGE, Dwwnloader
 from py2winapp.generate_exe import generate_exe
 
 ######################################################################
@@ -42,10 +50,11 @@ DEFAULT_IGNORE_PATTERNS = [
     "py2winapp.py",
     "build.py",
 ]
+_DEFAULT_IGNORE_PATTERNS = frozenset(DEFAULT_IGNORE_PATTERNS)
 
 DEFAULT_BUILD_DIR = "build"  # ensure this is in .gitignore
 DEFAULT_DIST_DIR = "dist"  # ensure this is in .gitignore
-DEFAULT_DOWNLOAD_DIR = "downloads"  # ensure this is in .gitignore
+CACHE_DIR_NAME = "py2winapp"  # under the user's cache directory
 
 DEFAULT_MAIN_FILE = "main.py"
 DEFAULT_REQUIREMENTS_FILE = "requirements.txt"
@@ -55,13 +64,62 @@ DEFAULT_LOG_FILE = "py2winapp.log"
 DEFAULT_PYDIST_DIR = "python"
 DEFAULT_SOURCE_DIR = "."
 
+UNZIP_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+# default deflate level of the dist zip file: the fastest one,
+# about 3 times faster than zlib's default (6) for a bit larger zip
+ZIP_COMPRESS_LEVEL = 1
+# already compressed files, stored in the dist zip file as is
+STORED_SUFFIXES = frozenset(
+    (".zip", ".whl", ".egg", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".png", ".jpg", ".jpeg")
+)
+
+# bytecode is compiled lazily at runtime, pip's self version check is useless here
+PIP_INSTALL_ARGS = [
+    "-m",
+    "pip",
+    "install",
+    "--no-warn-script-location",
+    "--no-compile",
+    "--disable-pip-version-check",
+    # a wheel of an older version is better than building the latest sdist
+    "--prefer-binary",
+]
+
+# wheels of requirements are kept here (under the download dir) for the next builds
+WHEELHOUSE_DIR = "wheels"
+
+# files of the previous build are moved to `<app_dir><suffix><random>` to be deleted
+TRASH_DIR_SUFFIX = ".trash-"
+
+# concurrent `pip install` processes, more of them tend to hit PyPI rate limits
+PIP_INSTALL_MAX_WORKERS = 5
+
+# less output to produce (and to drain) for commands executed quietly
+QUIET_COMMAND_ENV = {
+    "PYTHONUNBUFFERED": "1",
+    "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+    "PIP_NO_COLOR": "1",
+    # the output is not shown, so a prompt (e.g. for index credentials) would hang
+    "PIP_NO_INPUT": "1",
+}
+
+# characters with a special meaning in `fnmatch` patterns
+_GLOB_MAGIC_RE = re.compile(r"[*?[]")
+
+# requirements reported by pip as not found
+_PIP_FAILED_REQUIREMENT_RE = re.compile(
+    r"^ERROR: (?:Could not find a version that satisfies the requirement"
+    r"|No matching distribution found for) (\S+)",
+    re.MULTILINE,
+)
+
 
 ######################################################################
 # Build data
 ######################################################################
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildData:
     """A class representing the data required to build a Windows application."""
 
@@ -90,39 +148,24 @@ class BuildData:
     exe_file: str
     exe_file_path: Path
     icon_file_path: Union[Path, None]
-    python_version: str
-    project_path: Path
-    build_dir_path: Path
-    dist_dir_path: Path
-    download_dir_path: Path
-    app_name: str
-    app_name_slug: str
-    input_source_dir: str
-    input_source_dir_path: Path
-    ignore_input_patterns: List[str]
-    main_file: str
-    main_file_path: Path
-    app_dir: str
-    app_dir_path: Path
-    python_dir: str
-    python_dir_path: Path
-    source_dir: str
-    source_dir_path: Path
-    requirements_file: str
-    requirements_file_path: Path
-    extra_pip_install_args: List[str]
-    exe_file: str
-    exe_file_path: Path
-    icon_file_path: Union[Path, None]
     show_console: bool
     zip_file_path: Union[Path, None]
+    explode_stdlib_zip: bool
+    force_clean: bool
+    dist_compress_level: int
+    parsed_requirements: Union[RequirementsFile, None] = None
 
 
-def _check_build_data(build_data: BuildData) -> None:
-    # python_version can be anything of the form:
+@lru_cache(maxsize=None)
+def _is_valid_python_version(python_version: str) -> bool:
+    # python version can be anything of the form:
     # `x.x.x` where any x may be set to a positive integer.
-    python_version_regex = re.compile(r"^(\d+|x)\.(\d+|x)\.(\d+|x)$")
-    if re.match(python_version_regex, build_data.python_version) is None:
+    parts = python_version.split(".")
+    return len(parts) == 3 and all(part.isdecimal() or part == "x" for part in parts)
+
+
+def _check_build_data(build_data: BuildData) -> None:
+    if not _is_valid_python_version(build_data.python_version):
         logger.error(
             f"Specified python version {build_data.python_version!r} "
             "does not have the correct format, "
@@ -130,41 +173,46 @@ def _check_build_data(build_data: BuildData) -> None:
         )
         raise ValueError(f"Invalid python version specified: {build_data.python_version}")
 
+    # one `stat()` per path instead of one per `exists()`/`is_dir()`/`is_file()` call
+
     # check project path
-    if not build_data.project_path.exists():
+    project_path_mode = _stat_mode(build_data.project_path)
+    if project_path_mode is None:
         logger.error(f"Project path {build_data.project_path!r} does not exist.")
         raise ValueError(f"Project path {build_data.project_path!r} not found.")
-    elif not build_data.project_path.is_dir():
+    elif not stat.S_ISDIR(project_path_mode):
         logger.error(f"Project path {build_data.project_path!r} is not a directory.")
         raise ValueError(f"Project path {build_data.project_path!r} is not a directory.")
 
     # check input source dir
-    if not build_data.input_source_dir_path.exists():
+    input_source_dir_path_mode = _stat_mode(build_data.input_source_dir_path)
+    if input_source_dir_path_mode is None:
         logger.error(f"Input source dir {build_data.input_source_dir_path!r} does not exist.")
         raise ValueError(f"Input source dir {build_data.input_source_dir_path!r} not found.")
-    elif not build_data.input_source_dir_path.is_dir():
+    elif not stat.S_ISDIR(input_source_dir_path_mode):
         logger.error(f"Input source dir {build_data.input_source_dir_path!r} is not a directory.")
         raise ValueError(
             f"Input source dir {build_data.input_source_dir_path!r} is not a directory."
         )
 
     # check main file
+    main_file_path_mode = _stat_mode(build_data.main_file_path)
     if build_data.run_as_package:
-        if not build_data.main_file_path.exists():
+        if main_file_path_mode is None:
             logger.error(
                 f"Run as package specified but package {build_data.main_file!r} " "does not exist."
             )
             raise ValueError(f"Package {build_data.main_file!r} not found.")
     else:
-        if not build_data.main_file_path.exists():
+        if main_file_path_mode is None:
             logger.error(f"Main file {build_data.main_file_path!r} does not exist.")
             raise ValueError(f"Main file {build_data.main_file_path!r} not found.")
-        elif not build_data.main_file_path.is_file():
+        elif not stat.S_ISREG(main_file_path_mode):
             logger.error(f"Main file {build_data.main_file_path!r} is not a file.")
             raise ValueError(f"Main file {build_data.main_file_path!r} is not a file.")
 
     # check requirements file
-    if not build_data.requirements_file_path.exists():
+    if _stat_mode(build_data.requirements_file_path) is None:
         logger.error(f"Requirements file {build_data.requirements_file_path!r} does not exist.")
         raise ValueError(f"Requirements file {build_data.requirements_file_path!r} not found.")
     else:
@@ -176,22 +224,62 @@ def _check_build_data(build_data: BuildData) -> None:
             raise ValueError(
                 f"Requirements file {build_data.requirements_file_path!r} " "contains errors."
             )
+        # keep the parsed file, so it is not parsed again later
+        build_data.parsed_requirements = req_checker
+
+    # check dist zip compress level
+    if not 0 <= build_data.dist_compress_level <= 9:
+        logger.error(f"Invalid dist compress level {build_data.dist_compress_level!r}.")
+        raise ValueError(
+            f"Dist compress level must be from 0 to 9, got {build_data.dist_compress_level!r}."
+        )
 
     # check icon file
     if build_data.icon_file_path is not None:
-        if not build_data.icon_file_path.exists():
+        if _stat_mode(build_data.icon_file_path) is None:
             logger.error(f"Icon file {build_data.icon_file_path!r} does not exist.")
             raise ValueError(f"Icon file {build_data.icon_file_path!r} not found.")
 
 
+def _stat_mode(path: Path) -> Union[int, None]:
+    """Get the mode of a path with a single `stat()` call.
+
+    Args:
+        path (Path): The path to check.
+
+    Returns:
+        Union[int, None]: The `st_mode` of the path, or None if it does not exist.
+    """
+    try:
+        return path.stat().st_mode
+    except (OSError, ValueError):  # like `Path.exists()`
+        return None
+
+
 def _log_build_data(build_data: BuildData) -> None:
     # debug build data, all attributes of build data are sorted alphabetically
+    # (`vars()` does not work with slots)
     data_str = "\n".join(
-        f"{attr:>22}: {value!r}" for attr, value in sorted(vars(build_data).items())
+        f"{attr:>22}: {getattr(build_data, attr)!r}"
+        for attr in sorted(field.name for field in fields(build_data))
     )
     logger.debug(f"Build data:\n{data_str}")
 
 
+def _user_cache_dir() -> Path:
+    """Get the per-user cache directory of py2winapp.
+
+    Returns:
+        Path: `py2winapp/Cache` under `%LOCALAPPDATA%` on Windows,
+            `py2winapp` under `$XDG_CACHE_HOME` (or `~/.cache`) elsewhere.
+    """
+    if sys.platform == "win32":
+        local_app_data = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(local_app_data) / CACHE_DIR_NAME / "Cache"
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / CACHE_DIR_NAME
+
+
 def _make_build_data(
     python_version: Union[str, None],
     project_path: Union[str, Path, None],
@@ -209,6 +297,10 @@ def _make_build_data(
     exe_file: Union[str, None],
     icon_file: Union[str, Path, None],
     make_dist: bool,
+    explode_stdlib_zip: bool,
+    download_dir: Union[str, Path, None],
+    force_clean: bool,
+    dist_compress_level: int,
 ) -> BuildData:
     # Python version
     if python_version is None:
@@ -251,7 +343,13 @@ def _make_build_data(
 
     build_dir_path = project_path / DEFAULT_BUILD_DIR
     dist_dir_path = project_path / DEFAULT_DIST_DIR
-    download_dir_path = project_path / DEFAULT_DOWNLOAD_DIR
+    # download dir
+    if download_dir is None:
+        # shared by all projects, so python and `get-pip.py` are downloaded only once
+        download_dir_path = _user_cache_dir()
+        logger.debug(f"Download dir not specified, using user cache: {download_dir_path!r}.")
+    else:
+        download_dir_path = project_path / download_dir
 
     if app_name is None:
         app_name = project_path.name
@@ -336,6 +434,9 @@ def _make_build_data(
         build_dir_path=build_dir_path,
         dist_dir_path=dist_dir_path,
         download_dir_path=download_dir_path,
+        explode_stdlib_zip=explode_stdlib_zip,
+        force_clean=force_clean,
+        dist_compress_level=dist_compress_level,
     )
 
 
@@ -346,7 +447,7 @@ def build(
     python_version: Union[str, None] = None,
     project_path: Union[str, Path, None] = None,
     input_source_dir: Union[str, None] = None,
-    ignore_input_patterns: Iterable[str] = [],
+    ignore_input_patterns: Iterable[str] = (),
     run_as_package: bool = False,
     main_file: Union[str, None] = None,
     app_name: Union[str, None] = None,
@@ -360,6 +461,10 @@ def build(
     icon_file: Union[str, Path, None] = None,
     make_dist: bool = True,
     console_log_level: Union[str, int, None] = "INFO",
+    explode_stdlib_zip: bool = False,
+    download_dir: Union[str, Path, None] = None,
+    force_clean: bool = False,
+    dist_compress_level: int = ZIP_COMPRESS_LEVEL,
 ) -> BuildData:
     """Build the app.
 
@@ -386,7 +491,8 @@ def build(
         show_console (bool, optional): Show console or not when running the app.
         requirements_file (str, optional): Name of the requirements file.
         extra_pip_install_args (List[str], optional): Extra args to pass for
-            "pip install" command.
+            "pip install" command, an option and its value are separate items,
+            e.g. `["--index-url", "https://example.com/simple"]`.
         python_dir (str, optional): Where to put python distribution
             files (relative to app_dir).
         source_dir (str, optional): Where to put source files (relative to app_dir).
@@ -400,6 +506,19 @@ def build(
             If None, no console output.
             Available values: "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL".
             Or use int values from 0 to 50.
+        explode_stdlib_zip (bool, optional): Extract the standard library zip file
+            (`pythonXX.zip`) to a directory. By default the standard library is
+            imported right from the zip file, which is faster to build.
+        download_dir (Union[str, Path, None], optional): Where to keep downloaded
+            files (relative to project_path).
+            If None, use a per-user cache directory shared by all projects.
+        force_clean (bool, optional): Always build the app from scratch.
+            By default the python distribution with installed requirements is kept
+            from the previous build if python version, requirements (with files
+            included by them) and pip install args did not change, only source files
+            are copied again. Requirements with local paths are always reinstalled.
+        dist_compress_level (int, optional): Deflate level (0-9) of the dist zip file.
+            The default (1) is the fastest, use 9 for the smallest zip file.
 
     Returns:
         BuildData: A data object containing information about the build process.
@@ -424,6 +543,10 @@ def build(
         exe_file=exe_file,
         icon_file=icon_file,
         make_dist=make_dist,
+        explode_stdlib_zip=explode_stdlib_zip,
+        download_dir=download_dir,
+        force_clean=force_clean,
+        dist_compress_level=dist_compress_level,
     )
     _log_build_data(build_data=build_data)
 
@@ -431,16 +554,57 @@ def build(
     _check_build_data(build_data=build_data)
 
     logger.info("Creating app directory...")
-    _create_files_infrastructure(build_data=build_data)
+    python_dist_is_reused = _create_files_infrastructure(build_data=build_data)
+
+    downloader = Dwwnloader(build_data.download_dir_path)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(_remove_trash_dirs, build_data=build_data)
+        try:
+            if not python_dist_is_reused:
+                logger.info("Downloading python distribution and pip...")
+                # network bound, so it is done while source files are copied
+                downloads = executor.submit(
+                    _download_all, build_data=build_data, downloader=downloader
+                )
+
+            logger.info("Copying source files...")
+            _copy_source_files(build_data=build_data)
+
+            if python_dist_is_reused:
+                logger.info("Python distribution and requirements are up to date, reusing them...")
+            else:
+                python_zip_path, getpippy_file_path = downloads.result()
+                _make_python_dist(
+                    build_data=build_data,
+                    python_zip_path=python_zip_path,
+                    getpippy_file_path=getpippy_file_path,
+                )
+        except BaseException:
+            # e.g. `KeyboardInterrupt`, which is raised in this thread only:
+            # stop downloads, so leaving the executor does not wait for them
+            downloader.cancel()
+            raise
 
-    logger.info("Copying source files...")
-    _copy_source_files(build_data=build_data)
+    logger.info("Generating startup executable...")
+    _make_startup_exe(build_data=build_data)
+
+    if make_dist:
+        logger.info("Making dist zip file...")
+        _make_zip_file(build_data=build_data)
+
+    logger.success("Done!")
 
+    return build_data
+
+
+def _make_python_dist(
+    build_data: BuildData, python_zip_path: Path, getpippy_file_path: Path
+) -> None:
     logger.info("Getting python distribution...")
-    _get_python_dist(build_data=build_data)
+    _get_python_dist(build_data=build_data, downloaded_python_zip_path=python_zip_path)
 
     logger.info("Getting pip...")
-    get_getpippy(build_data=build_data)
+    get_getpippy(build_data=build_data, getpippy_file_path=getpippy_file_path)
 
     logger.info("Installing pip...")
     prepare_for_pip_install(build_data=build_data)
@@ -452,68 +616,365 @@ def build(
     logger.info("Installing requirements...")
     _install_requirements_txt_file(build_data=build_data)
 
-    _fix_main_file(build_data=build_data)
+    # only a complete python distribution may be reused
+    build_stamp = _build_stamp(build_data)
+    if build_stamp is not None:
+        _build_stamp_file_path(build_data).write_text(build_stamp, encoding="utf8")
 
-    logger.info("Generating startup executable...")
-    _make_startup_exe(build_data=build_data)
 
-    if make_dist:
-        logger.info("Making dist zip file...")
-        _make_zip_file(build_data=build_data)
+######################################################################
+# Functions
+######################################################################
 
-    logger.success("Done!")
 
-    return build_data
+def _create_files_infrastructure(build_data: BuildData) -> bool:
+    """Create build directories and clean the app directory.
 
+    The python distribution directory is kept if it can be reused (see `_build_stamp`).
 
-######################################################################
-# Functions
-######################################################################
+    Args:
+        build_data (BuildData): The build data object.
+
+    Raises:
+        ValueError: If the app directory is not inside the build directory.
+
+    Returns:
+        bool: True if the python distribution from the previous build is reused.
+    """
+    # build dir is created along with the app dir below
+    if build_data.zip_file_path is not None:
+        build_data.dist_dir_path.mkdir(exist_ok=True)
+    build_data.download_dir_path.mkdir(parents=True, exist_ok=True)
+
+    # never delete anything outside of build directory, e.g. with `app_dir=".."`
+    if build_data.build_dir_path.resolve() not in build_data.app_dir_path.resolve().parents:
+        raise ValueError(
+            f"App dir {build_data.app_dir_path!r} is not inside "
+            f"build dir {build_data.build_dir_path!r}."
+        )
+
+    stamp_file_path = _build_stamp_file_path(build_data)
+    # python dir must not be mixed with source files to be kept alone
+    python_dist_is_reused = (
+        not build_data.force_clean
+        and build_data.python_dir_path.parent == build_data.app_dir_path
+        and build_data.python_dir_path.is_dir()
+        and stamp_file_path.is_file()
+        and stamp_file_path.read_text(encoding="utf8") == _build_stamp(build_data)
+    )
+    if not python_dist_is_reused:
+        stamp_file_path.unlink(missing_ok=True)
+
+    # clean app directory, but keep it: on Windows removing and creating it again
+    # fails if the directory is open somewhere (e.g. in Explorer)
+    if build_data.app_dir_path.is_dir():
+        logger.debug(f"Cleaning app directory {build_data.app_dir_path!r}")
+        # renaming is cheap, deleting many files is not (especially on Windows),
+        # so old files are moved aside and deleted by `_remove_trash_dirs` later
+        trash_dir_path = tempfile.mkdtemp(
+            prefix=f"{build_data.app_dir_path.name}{TRASH_DIR_SUFFIX}",
+            dir=build_data.build_dir_path,
+        )
+        with os.scandir(build_data.app_dir_path) as it:
+            for entry in it:
+                if python_dist_is_reused and entry.name == build_data.python_dir_path.name:
+                    continue
+                try:
+                    os.rename(entry.path, os.path.join(trash_dir_path, entry.name))
+                    continue
+                except OSError:
+                    logger.debug(f"Can not move {entry.path!r} aside, deleting it")
+                # the type comes from the directory listing, no extra `stat()` calls
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, onerror=_chmod_and_retry)
+                else:
+                    os.unlink(entry.path)
+    else:
+        logger.debug(f"Creating app directory {build_data.app_dir_path!r}")
+        build_data.app_dir_path.mkdir(parents=True)
+    return python_dist_is_reused
+
+
+def _remove_trash_dirs(build_data: BuildData) -> None:
+    """Delete files of previous builds moved aside by `_create_files_infrastructure`.
+
+    Leftovers of interrupted builds are deleted too. Errors are only logged:
+    the files are not needed anymore, the next build will try again.
+
+    Args:
+        build_data (BuildData): The build data object.
+    """
+    for trash_dir_path in build_data.build_dir_path.glob(
+        f"{glob.escape(build_data.app_dir_path.name)}{TRASH_DIR_SUFFIX}*"
+    ):
+        logger.debug(f"Deleting {trash_dir_path!r}")
+        if sys.platform == "win32":
+            # native `rd` is much faster than `shutil.rmtree` on large trees;
+            # whatever it leaves (e.g. locked files) is tried again below
+            subprocess.run(
+                ["cmd", "/c", "rd", "/s", "/q", str(trash_dir_path)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            if not os.path.lexists(trash_dir_path):
+                continue
+        try:
+            shutil.rmtree(trash_dir_path, onerror=_chmod_and_retry)
+        except OSError as e:
+            logger.debug(f"Failed to delete {trash_dir_path!r}: {e}")
+
+
+def _chmod_and_retry(func: Callable[[str], None], path: str, exc_info: tuple) -> None:
+    # `shutil.rmtree` error handler: read-only files (e.g. installed by pip)
+    # can not be deleted on Windows
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def _build_stamp_file_path(build_data: BuildData) -> Path:
+    # next to the app directory, so it does not get into the dist zip file
+    return build_data.app_dir_path.with_name(f"{build_data.app_dir_path.name}.stamp")
+
+
+def _build_stamp(build_data: BuildData) -> Union[str, None]:
+    """Get a digest of everything the python distribution of the app depends on.
+
+    Args:
+        build_data (BuildData): The build data object.
+
+    Returns:
+        Union[str, None]: The hex digest, or None if the python distribution
+            must not be reused (see `_requirements_file_paths`).
+    """
+    return _requirements_digest(
+        build_data,
+        extra=(
+            build_data.python_version,
+            build_data.extra_pip_install_args,
+            build_data.explode_stdlib_zip,
+            # `._pth` file refers to the source directory
+            build_data.source_dir_path.name,
+        ),
+    )
+
+
+def _requirements_digest(build_data: BuildData, extra: tuple) -> Union[str, None]:
+    """Get a digest of the requirements files and other values they are used with.
 
+    Args:
+        build_data (BuildData): The build data object.
+        extra (tuple): Other values to digest, e.g. the python version. Must have a stable `repr`.
 
-def _create_files_infrastructure(build_data: BuildData) -> None:
-    build_data.build_dir_path.mkdir(exist_ok=True)
-    build_data.dist_dir_path.mkdir(exist_ok=True)
-    build_data.download_dir_path.mkdir(exist_ok=True)
+    Returns:
+        Union[str, None]: The hex digest, or None if the requirements can not be
+            digested (see `_requirements_file_paths`).
+    """
+    requirements_file_paths = _requirements_file_paths(build_data)
+    if requirements_file_paths is None:
+        return None
+    digest = hashlib.sha256()
+    for file_path in requirements_file_paths:
+        digest.update(hashlib.sha256(file_path.read_bytes()).digest())
+    digest.update(repr(extra).encode())
+    return digest.hexdigest()
 
-    logger.debug(f"Creating app directory {build_data.app_dir_path!r}")
-    build_data.app_dir_path.mkdir(exist_ok=True)
-    # clean app directory
-    for file_path in build_data.app_dir_path.iterdir():
-        if file_path.is_file():
-            file_path.unlink()
-        elif file_path.is_dir():
-            shutil.rmtree(file_path)
+
+def _requirements_file_paths(build_data: BuildData) -> Union[List[Path], None]:
+    """Get the requirements file and all files it includes with `-r` and `-c`.
+
+    Args:
+        build_data (BuildData): The build data object.
+
+    Returns:
+        Union[List[Path], None]: The file paths, or None if installed requirements
+            depend on something else that may change between builds: a local
+            path requirement, a remote requirements file or a file that can not
+            be read.
+    """
+    file_paths: List[Path] = []
+    pending_file_paths = [build_data.requirements_file_path]
+    while pending_file_paths:
+        file_path = pending_file_paths.pop()
+        if file_path in file_paths:
+            continue
+        file_paths.append(file_path)
+        if (
+            file_path == build_data.requirements_file_path
+            and build_data.parsed_requirements is not None
+        ):
+            parsed_requirements = build_data.parsed_requirements
+        else:
+            try:
+                parsed_requirements = RequirementsFile.from_file(str(file_path))
+            except OSError as e:
+                logger.debug(f"Can not read {file_path!r}: {e}")
+                return None
+        for requirement in parsed_requirements.requirements:
+            if requirement.is_local_path:
+                logger.debug(f"Local requirement {requirement.line!r}, not reusing python dist")
+                return None
+        for option in parsed_requirements.options:
+            for name in (
+                *option.options.get("requirements", ()),
+                *option.options.get("constraints", ()),
+            ):
+                if "://" in name:
+                    logger.debug(f"Remote requirements file {name!r}, not reusing python dist")
+                    return None
+                # relative to the including file, like pip does
+                pending_file_paths.append(file_path.parent / name)
+    return file_paths
 
 
 def _copy_source_files(build_data: BuildData) -> None:
-    ignore_patterns = build_data.ignore_input_patterns
-    ignore_patterns.append(build_data.app_dir)
-    ignore_patterns += DEFAULT_IGNORE_PATTERNS
-    if not build_data.source_dir_path.is_dir():
-        build_data.source_dir_path.mkdir()
+    # a new set: `build_data.ignore_input_patterns` is left as the user specified it
+    ignore_patterns = _DEFAULT_IGNORE_PATTERNS.union(
+        build_data.ignore_input_patterns, (build_data.app_dir,)
+    )
     logger.debug(
         f"Copying files from {build_data.input_source_dir_path!r} "
         f"to {build_data.source_dir_path!r}"
     )
-    shutil.copytree(
-        src=build_data.input_source_dir_path,
-        dst=build_data.source_dir_path,
-        ignore=shutil.ignore_patterns(*ignore_patterns),
-        dirs_exist_ok=True,
+    ignore = _fast_ignore(ignore_patterns)
+    # the walk starts from a normalized path, so paths of entries are normalized too
+    # and are compared with the main file path without normalizing every one of them
+    input_source_dir_path = os.path.normpath(build_data.input_source_dir_path)
+    main_file_key = os.path.normcase(os.path.normpath(build_data.main_file_path))
+    main_file_is_copied = False
+
+    # like `shutil.copytree`, but the main file is fixed while being copied,
+    # so it is not read and written once again afterwards.
+    # Copying many small files is bound by per-file syscall latency, not bandwidth,
+    # so files are copied by a thread pool, while directories are created in
+    # this thread before any file in them is copied.
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        futures = []
+        dirs = [(input_source_dir_path, str(build_data.source_dir_path))]
+        while dirs:
+            src_dir, dst_dir = dirs.pop()
+            with os.scandir(src_dir) as it:
+                entries = list(it)
+            ignored_names = ignore(src_dir, [entry.name for entry in entries])
+            os.makedirs(dst_dir, exist_ok=True)
+            for entry in entries:
+                if entry.name in ignored_names:
+                    continue
+                dst_path = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    dirs.append((entry.path, dst_path))
+                elif os.path.normcase(entry.path) == main_file_key:
+                    futures.append(executor.submit(_fix_main_file, build_data, dst_path))
+                    main_file_is_copied = True
+                else:
+                    futures.append(executor.submit(_copy_file, entry.path, dst_path))
+        for future in futures:
+            future.result()  # re-raise copy errors
+
+    if not main_file_is_copied:
+        logger.error(
+            f"Main file {build_data.main_file_path!r} is not in input source dir "
+            f"{build_data.input_source_dir_path!r} or is ignored."
+        )
+        raise ValueError(f"Main file {build_data.main_file_path!r} was not copied.")
+
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _CopyFileW = _kernel32.CopyFileW
+    _CopyFileW.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL)
+    _CopyFileW.restype = wintypes.BOOL
+
+
+def _copy_file(src_path: str, dst_path: str) -> None:
+    if sys.platform == "win32":
+        # the whole copy is done by the kernel in a single call,
+        # `shutil.copyfile` would pass every chunk through a Python buffer
+        if not _CopyFileW(src_path, dst_path, False):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return
+    # like `shutil.copy2`, but without copying timestamps and extended attributes,
+    # which are useless for the app and cost several syscalls per file;
+    # `shutil.copyfile` uses zero-copy `os.sendfile` (Linux) or `fcopyfile` (macOS)
+    shutil.copyfile(src_path, dst_path)
+    shutil.copymode(src_path, dst_path)
+
+
+@lru_cache(maxsize=8)
+def _fast_ignore(patterns: FrozenSet[str]) -> Callable[[str, List[str]], Set[str]]:
+    """Make an ignore function that works like `shutil.ignore_patterns`.
+
+    Exact names (e.g. `__pycache__`) and suffixes (e.g. `*.pyc`) are matched with
+    set lookups and `str.endswith`, the other patterns are translated by `fnmatch`
+    and compiled once into a single regular expression.
+    The function is cached, so repeated builds in the same process reuse it.
+
+    Args:
+        patterns (FrozenSet[str]): Glob-style patterns of names to ignore.
+
+    Returns:
+        Callable[[str, List[str]], Set[str]]: A function taking a directory path
+            and names in it, and returning the names to ignore.
+    """
+    exact_names = set()
+    suffixes = []
+    other_patterns = []
+    for pattern in patterns:
+        # `fnmatch` is case-insensitive on Windows, so are the fast checks
+        pattern = os.path.normcase(pattern)
+        if not _GLOB_MAGIC_RE.search(pattern):
+            exact_names.add(pattern)
+        elif pattern.startswith("*") and not _GLOB_MAGIC_RE.search(pattern, 1):
+            suffixes.append(pattern[1:])
+        else:
+            other_patterns.append(pattern)
+    suffixes_tuple = tuple(suffixes)
+    other_patterns_re = (
+        re.compile("|".join(fnmatch.translate(pattern) for pattern in other_patterns))
+        if other_patterns
+        else None
     )
 
+    def ignore(path: str, names: List[str]) -> Set[str]:
+        ignored_names = set()
+        for name in names:
+            normcased_name = os.path.normcase(name)
+            if (
+                normcased_name in exact_names
+                or normcased_name.endswith(suffixes_tuple)
+                or (other_patterns_re is not None and other_patterns_re.match(normcased_name))
+            ):
+                ignored_names.add(name)
+        return ignored_names
 
-def _get_python_dist(build_data: BuildData) -> None:
-    # download python zip file
-    downloader = Dwwnloader(build_data.download_dir_path)
+    return ignore
+
+
+def _download_all(build_data: BuildData, downloader: Dwwnloader) -> Tuple[Path, Path]:
+    """Download python distribution and `get-pip.py` concurrently.
+
+    Args:
+        build_data (BuildData): The build data object.
+        downloader (Dwwnloader): The downloader to use.
+
+    Returns:
+        Tuple[Path, Path]: The paths to the downloaded python zip file
+            and `get-pip.py` file.
+    """
     # python zip file name is like `python-3.9.1-embed-amd64.zip`
     python_file_name = f"python-{build_data.python_version}-embed-amd64.zip"
-    downloaded_python_zip_path = downloader.download(
-        url=f"{PYTHON_URL}/{build_data.python_version}/{python_file_name}",
-        file=python_file_name,
+    python_zip_path, getpippy_file_path = downloader.download_many(
+        [
+            (f"{PYTHON_URL}/{build_data.python_version}/{python_file_name}", python_file_name),
+            (GETPIPPY_URL, GETPIPPY_FILE),
+        ]
     )
+    return python_zip_path, getpippy_file_path
+
 
+def _get_python_dist(build_data: BuildData, downloaded_python_zip_path: Path) -> None:
     # extract python zip file to build folder
     logger.debug(f"Extracting {downloaded_python_zip_path!r} to {build_data.python_dir_path!r}")
     _unzip(
@@ -522,29 +983,31 @@ def _get_python_dist(build_data: BuildData) -> None:
     )
 
 
-def get_getpippy(build_data: BuildData) -> None:
-    """Download `get-pip.py` and copies it to the python distribution directory.
+def get_getpippy(build_data: BuildData, getpippy_file_path: Path) -> None:
+    """Copy downloaded `get-pip.py` to the python distribution directory.
 
     Args:
         build_data (BuildData): The build data object.
-
-    Returns:
-        Path: The path to the `get-pip.py` file.
+        getpippy_file_path (Path): The path to the downloaded `get-pip.py` file.
     """
-    # download `get-pip.py`
-    downloader = Dwwnloader(build_data.download_dir_path)
-    getpippy_file_path = downloader.download(file=GETPIPPY_FILE, url=GETPIPPY_URL)
-
-    # copy `get-pip.py` to python distribution directory
-    shutil.copy2(getpippy_file_path, build_data.python_dir_path)
+    target_path = build_data.python_dir_path / GETPIPPY_FILE
+    try:
+        # it is only read and deleted after pip is installed, so the cached file
+        # can be shared instead of copied
+        os.link(getpippy_file_path, target_path)
+    except OSError:  # e.g. the download dir is on another drive
+        shutil.copyfile(getpippy_file_path, target_path)
 
 
 def prepare_for_pip_install(build_data: BuildData) -> None:
     """Prepare the extracted embedded python version for pip installation.
 
     - Uncomment `import site` line from `pythonXX._pth` file
-    - Extract `pythonXX.zip` zip file to `pythonXX.zip` folder
-    - delete `pythonXX.zip` zip file
+    - If `build_data.explode_stdlib_zip` is set:
+        - Extract `pythonXX.zip` zip file to `pythonXX.zip` folder
+        - delete `pythonXX.zip` zip file
+
+    Otherwise the standard library is imported right from `pythonXX.zip` (zipimport).
 
     Args:
         build_data (BuildData): The build data object.
@@ -552,7 +1015,8 @@ def prepare_for_pip_install(build_data: BuildData) -> None:
     Returns:
         None
     """
-    short_python_version = "".join(build_data.python_version.split(".")[:2])  # "3.9.7" -> "39"
+    major, minor, *_ = build_data.python_version.split(".")
+    short_python_version = f"{major}{minor}"  # "3.9.7" -> "39"
     pth_file = f"python{short_python_version}._pth"  # python39._pth
     pythonzip_file = f"python{short_python_version}.zip"  # python39.zip
 
@@ -568,80 +1032,186 @@ def prepare_for_pip_install(build_data: BuildData) -> None:
     relative_path_to_source += f"\\{build_data.source_dir_path.name}"
 
     pth_file_content = (
-        f"{pythonzip_file}\n"
-        + f"{relative_path_to_source}\n\n"
-        + "# Uncomment to run site.main() automatically\n"
-        + "import site\n"
+        f"{pythonzip_file}\n{relative_path_to_source}\n\n"
+        "# Uncomment to run site.main() automatically\nimport site\n"
     )
     pth_file_path.write_text(pth_file_content, encoding="utf8")
 
-    pythonzip_dir_path = Path(pythonzip_file_path)
+    if not build_data.explode_stdlib_zip:
+        return
+
+    # the folder gets the `pythonXX.zip` name, it is what `._pth` refers to;
+    # extract next to the zip file first, so it is left intact if extraction fails
+    pythonzip_dir_path = pythonzip_file_path.with_name(f"{pythonzip_file}.d")
     logger.debug(f"Extracting {pythonzip_file_path!r} to {pythonzip_dir_path!r}")
-    pythonzip_file_path = pythonzip_file_path.rename(pythonzip_file_path.with_suffix(".temp_zip"))
     _unzip(pythonzip_file_path, pythonzip_dir_path)
     pythonzip_file_path.unlink()
+    pythonzip_dir_path.rename(pythonzip_file_path)
 
 
 def _install_pip(pydist_dir_path: Path) -> None:
-    _execute_os_command(
-        command="python.exe get-pip.py --no-warn-script-location",
+    # success is checked below, the (long) output of `get-pip.py` is not needed
+    _execute_os_command_quiet(
+        command=[str(pydist_dir_path / "python.exe"), "get-pip.py", "--no-warn-script-location"],
         cwd=str(pydist_dir_path),
     )
-    if not (pydist_dir_path / "Scripts").exists():
+    # pip is run as `python.exe -m pip`, so check the package, not `Scripts`
+    if not (pydist_dir_path / "Lib" / "site-packages" / "pip").is_dir():
         raise RuntimeError("Can not install `pip` with `get-pip.py`!")
 
 
 def _install_requirements_txt_file(build_data: BuildData) -> None:
     logger.debug(f"Requirements file path: {build_data.requirements_file_path!r}")
 
-    if build_data.extra_pip_install_args:
-        extra_args_str = extra_args_str = " " + " ".join(build_data.extra_pip_install_args)
-    else:
-        extra_args_str = ""
-    scripts_dir_path = build_data.python_dir_path / "Scripts"
-    command = (
-        "pip3.exe install --no-cache-dir --no-warn-script-location "
-        f"-r {str(build_data.requirements_file_path)}{extra_args_str}"
-    )
+    wheelhouse_dir_path = build_data.download_dir_path / WHEELHOUSE_DIR
+    requirements_args = [
+        "-r",
+        str(build_data.requirements_file_path),
+        *build_data.extra_pip_install_args,
+    ]
     try:
-        _execute_os_command(command=command, cwd=str(scripts_dir_path))
+        _fill_wheelhouse(build_data=build_data, wheelhouse_dir_path=wheelhouse_dir_path)
+        command = [
+            *_pip_install_command(build_data),
+            "--no-index",
+            "--find-links",
+            str(wheelhouse_dir_path),
+            *requirements_args,
+        ]
+        _execute_os_command_quiet(command=command, cwd=str(build_data.python_dir_path))
+        return
+    except Exception as e:
+        logger.warning(f"Can not install requirements from the wheelhouse, using index: {e}")
+
+    command = [
+        *_pip_install_command(build_data),
+        "--find-links",
+        str(wheelhouse_dir_path),
+        *requirements_args,
+    ]
+    try:
+        _execute_os_command_quiet(command=command, cwd=str(build_data.python_dir_path))
         return
     except Exception as e:
         error_message = str(e)
+        pip_error = str(e.args[-1])
     logger.error(error_message)
     logger.error(f"Failed to install requirements from {build_data.requirements_file_path!r}. ")
 
     # try to install requirements one by one
-    """ #!
     logger.error("Trying to install requirements one by one.")
-    install_requirements_txt_1by1(build_data)
-    """
+    if _install_requirements_txt_1by1(build_data, pip_error=pip_error):
+        return
 
     raise RuntimeError(
         f"Failed to install requirements from {build_data.requirements_file_path!r}. "
     )
 
 
-def _install_requirements_txt_1by1(build_data: BuildData) -> None:
-    requirements = build_data.requirements_file_path.read_text().splitlines()
-    if build_data.extra_pip_install_args:
-        extra_args_str = extra_args_str = " " + " ".join(build_data.extra_pip_install_args)
-    else:
-        extra_args_str = ""
-    scripts_dir_path = build_data.python_dir_path / "Scripts"
-    failed_to_install_modules = []
-    for line in requirements:
-        module = line.strip()
-        if not module or module.startswith("#"):
-            continue
-        command = (
-            "pip3.exe install --no-cache-dir --no-warn-script-location " f"{module}{extra_args_str}"
-        )
+def _fill_wheelhouse(build_data: BuildData, wheelhouse_dir_path: Path) -> None:
+    """Build wheels of requirements (and their dependencies) in the wheelhouse directory.
+
+    Wheels are downloaded, or built from sdists, with `pip wheel`. It is done once
+    for the same requirements, python version and pip args, then repeated after
+    `DEFAULT_MAX_AGE`, so unpinned requirements get updated. Builds in between
+    install everything from the wheelhouse without network access.
+    Requirements with local paths are built every time (see `_requirements_file_paths`).
+
+    Args:
+        build_data (BuildData): The build data object.
+        wheelhouse_dir_path (Path): The wheelhouse directory.
+
+    Raises:
+        Exception: If `pip wheel` failed.
+    """
+    done_file_path = None
+    requirements_digest = _requirements_digest(
+        build_data, extra=(build_data.python_version, build_data.extra_pip_install_args)
+    )
+    if requirements_digest is not None:
+        done_file_path = wheelhouse_dir_path / f"{requirements_digest}.done"
         try:
-            _execute_os_command(command=command, cwd=str(scripts_dir_path))
+            if time.time() - done_file_path.stat().st_mtime < DEFAULT_MAX_AGE:
+                logger.debug(f"Requirements are already in the wheelhouse {wheelhouse_dir_path!r}")
+                return
+        except OSError:  # not built yet
+            pass
+    wheelhouse_dir_path.mkdir(parents=True, exist_ok=True)
+    command = [
+        str(build_data.python_dir_path / "python.exe"),
+        "-m",
+        "pip",
+        "wheel",
+        "--disable-pip-version-check",
+        "--prefer-binary",
+        "--wheel-dir",
+        str(wheelhouse_dir_path),
+        "-r",
+        str(build_data.requirements_file_path),
+        *build_data.extra_pip_install_args,
+    ]
+    _execute_os_command_quiet(command=command, cwd=str(build_data.python_dir_path))
+    if done_file_path is not None:
+        done_file_path.touch()
+
+
+def _install_requirements_txt_1by1(build_data: BuildData, pip_error: str) -> bool:
+    """Install requirements in batches and one by one, to get as many of them as possible.
+
+    The requirements pip could not find (according to `pip_error`) are set aside and
+    the rest is installed at once, then what is left is installed one by one.
+    Requirements that could not be installed are listed in
+    `FAILED_TO_INSTALL_MODULES.txt` in the app directory.
+
+    Args:
+        build_data (BuildData): The build data object.
+        pip_error (str): Error output of the failed install of the whole requirements file.
+
+    Returns:
+        bool: True if all requirements are installed.
+    """
+    pip_install_command = _pip_install_command(build_data)
+    extra_args = build_data.extra_pip_install_args
+    option_lines, modules = _flatten_requirements_file(build_data.requirements_file_path)
+
+    def install_batch(batch: List[str]) -> None:
+        # a requirements file, as lines may contain options valid only there (`--hash`);
+        # options (e.g. index urls) and constraints apply to every batch
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_file_path = Path(temp_dir) / DEFAULT_REQUIREMENTS_FILE
+            batch_file_path.write_text("\n".join([*option_lines, *batch]), encoding="utf8")
+            command = [*pip_install_command, "-r", str(batch_file_path), *extra_args]
+            _execute_os_command_quiet(command=command, cwd=str(build_data.python_dir_path))
+
+    if not modules:  # e.g. all of them are in remote files, nothing to split
+        return False
+    failed_names = {_canonical_name(name) for name in _PIP_FAILED_REQUIREMENT_RE.findall(pip_error)}
+    suspects = [module for module in modules if _canonical_name(module) in failed_names]
+    if suspects and len(suspects) < len(modules):
+        try:
+            install_batch([m for m in modules if m not in suspects])
+            modules = suspects
+        except Exception:
+            logger.debug("Installing requirements without failed ones failed too")
+
+    def install(module: str) -> bool:
+        try:
+            install_batch([module])
+            return True
         except Exception:
             logger.error(f"FAILED TO INSTALL {module!r}")
-            failed_to_install_modules.append(module)
+            return False
+
+    # every install is a separate pip process, so run several of them at once
+    failed_modules = set()
+    with ThreadPoolExecutor(
+        max_workers=min(PIP_INSTALL_MAX_WORKERS, os.cpu_count() or 1)
+    ) as executor:
+        futures = {executor.submit(install, module): module for module in modules}
+        for future in as_completed(futures):
+            if not future.result():
+                failed_modules.add(futures[future])
+    failed_to_install_modules = [m for m in modules if m in failed_modules]
 
     if failed_to_install_modules:
         (build_data.app_dir_path / "FAILED_TO_INSTALL_MODULES.txt").write_text(
@@ -649,8 +1219,53 @@ def _install_requirements_txt_1by1(build_data: BuildData) -> None:
         )
         logger.error(f"Failed to install {len(failed_to_install_modules)} modules")
         logger.error("See FAILED_TO_INSTALL_MODULES.txt for more info")
-        return
-    return
+        return False
+    return True
+
+
+def _flatten_requirements_file(file_path: Path) -> Tuple[List[str], List[str]]:
+    """Read requirement lines of a requirements file and of all files it includes.
+
+    Args:
+        file_path (Path): The path to the requirements file.
+
+    Returns:
+        Tuple[List[str], List[str]]: Option lines (with `-c` constraint files and remote
+            `-r` files, local paths made absolute) and requirement lines.
+    """
+    option_lines: List[str] = []
+    requirement_lines: List[str] = []
+    parsed_requirements = RequirementsFile.from_file(str(file_path))
+    for option in parsed_requirements.options:
+        included_names = option.options.get("requirements", [])
+        constraint_names = option.options.get("constraints", [])
+        if not included_names and not constraint_names:
+            option_lines.append(option.line)
+        for name in included_names:
+            if "://" in name:
+                option_lines.append(f"-r {name}")
+                continue
+            # relative to the including file, like pip does
+            nested_option_lines, nested_requirement_lines = _flatten_requirements_file(
+                file_path.parent / name
+            )
+            option_lines.extend(nested_option_lines)
+            requirement_lines.extend(nested_requirement_lines)
+        for name in constraint_names:
+            option_lines.append(f"-c {name if '://' in name else file_path.parent / name}")
+    # continuations joined and comments stripped
+    requirement_lines.extend(req.line for req in parsed_requirements.requirements)
+    return option_lines, requirement_lines
+
+
+def _canonical_name(name: str) -> str:
+    # like `packaging.utils.canonicalize_name()`, e.g. "Foo_Bar" -> "foo-bar"
+    return re.sub(r"[-_.]+", "-", re.split(r"[\s<>=!~;\[@]", name, maxsplit=1)[0]).lower()
+
+
+def _pip_install_command(build_data: BuildData) -> List[str]:
+    # full path: without a shell the executable is not looked up in `cwd`
+    return [str(build_data.python_dir_path / "python.exe"), *PIP_INSTALL_ARGS]
 
 
 def _make_startup_exe(build_data: BuildData) -> None:
@@ -678,7 +1293,13 @@ def _make_startup_exe(build_data: BuildData) -> None:
     )
 
 
-def _fix_main_file(build_data: BuildData) -> None:
+def _fix_main_file(build_data: BuildData, destination_path: str) -> None:
+    """Copy the main file, inserting the headers it needs to run from the app.
+
+    Args:
+        build_data (BuildData): The build data object.
+        destination_path (str): Where to write the main file.
+    """
     header_no_console = None
     header_cwd = None
     if not build_data.show_console:
@@ -697,35 +1318,49 @@ def _fix_main_file(build_data: BuildData) -> None:
         header_cwd += "os.chdir(os.path.dirname(__file__))\n\n"
         # header_cwd = f"os.chdir({build_data.source_dir!r})\n\n"
 
-    # insert header to main file
+    header = b""
     if header_no_console is not None or header_cwd is not None:
-        main_file_in_build_dir_path = build_data.source_dir_path / build_data.main_file
-        assert main_file_in_build_dir_path.exists()
-        main_file_content = main_file_in_build_dir_path.read_text(
-            encoding="utf8", errors="surrogateescape"
-        )
-        header = ""
-        if header_no_console is not None and header_no_console not in main_file_content:
-            logger.debug("Fixing main file to not show console")
-            header += header_no_console
-        if header_cwd is not None and header_cwd not in main_file_content:
-            logger.debug("Fixing main file to set cwd")
-            header += header_cwd
-        logger.debug(f"Writing main file {main_file_in_build_dir_path!r}")
-        main_file_in_build_dir_path.write_text(
-            header + main_file_content, encoding="utf8", errors="surrogateescape"
-        )
+        # headers are pure ascii, so work with bytes: no decoding of the file.
+        # They are inserted at the very beginning, so only look for them there
+        # and stream the rest, the file is never held in memory as a whole
+        with open(build_data.main_file_path, "rb") as source:
+            prefix = source.read(len(header_no_console or "") + len(header_cwd or ""))
+            if header_no_console is not None and header_no_console.encode() not in prefix:
+                logger.debug("Fixing main file to not show console")
+                header += header_no_console.encode()
+            if header_cwd is not None and header_cwd.encode() not in prefix:
+                logger.debug("Fixing main file to set cwd")
+                header += header_cwd.encode()
+            if header:
+                logger.debug(f"Writing main file {destination_path!r}")
+                with open(destination_path, "wb") as target:
+                    target.write(header)
+                    target.write(prefix)
+                    shutil.copyfileobj(source, target)
+                return
+    _copy_file(str(build_data.main_file_path), destination_path)
 
 
 def _make_zip_file(build_data: BuildData) -> None:
-    logger.debug(f"Making zip file {build_data.zip_file_path!r}")
+    zip_file_path = Path(f"{build_data.zip_file_path}.zip")
+    logger.debug(f"Making zip file {zip_file_path!r}")
     root_dir = build_data.build_dir_path
-    shutil.make_archive(
-        base_name=str(build_data.zip_file_path),
-        format="zip",
-        root_dir=str(root_dir),
-        base_dir=str(build_data.app_dir_path.relative_to(root_dir)),
-    )
+    # write to a temporary file first so that an interrupted build
+    # never leaves a truncated zip file in `dist`
+    temp_zip_file_path = zip_file_path.with_name(zip_file_path.name + ".tmp")
+    with zipfile.ZipFile(
+        temp_zip_file_path,
+        "w",
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=build_data.dist_compress_level,
+        allowZip64=True,
+    ) as zip_file:
+        zip_file.write(build_data.app_dir_path, build_data.app_dir_path.relative_to(root_dir))
+        for path in sorted(build_data.app_dir_path.rglob("*")):
+            # deflating already compressed data (e.g. `pythonXX.zip`) only wastes time
+            compress_type = zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else None
+            zip_file.write(path, path.relative_to(root_dir), compress_type=compress_type)
+    os.replace(temp_zip_file_path, zip_file_path)
 
 
 ######################################################################
@@ -736,61 +1371,101 @@ def _make_zip_file(build_data: BuildData) -> None:
 def _unzip(zip_file_path: Path, destination_dir_path: Path) -> None:
     """Extract all files from a zip archive to a destination directory.
 
+    Native `tar` (bsdtar, shipped with Windows 10+, reads zip archives) is used when
+    available as it is much faster for archives with many small files.
+    Falls back to `zipfile` otherwise.
+
     Args:
         zip_file_path (Path): The path to the zip archive to extract.
         destination_dir_path (Path): The path to the directory to extract the files to.
     """
     logger.debug(f"Unzipping {zip_file_path!r} to {destination_dir_path!r}...")
+    destination_dir_path.mkdir(parents=True, exist_ok=True)
+
+    tar = shutil.which("tar")
+    if tar is not None:
+        try:
+            subprocess.run(
+                [tar, "-xf", str(zip_file_path), "-C", str(destination_dir_path)],
+                check=True,
+                capture_output=True,
+            )
+            return
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug(f"Native unzip failed, falling back to zipfile: {e}")
 
     with zipfile.ZipFile(zip_file_path, "r") as zip_file:
-        zip_file.extractall(destination_dir_path)
+        members = zip_file.infolist()
+        target_paths = [_zip_member_path(destination_dir_path, m.filename) for m in members]
+        # create every directory once instead of once per member
+        dir_paths = {p if m.is_dir() else p.parent for m, p in zip(members, target_paths)}
+        for dir_path in sorted(dir_paths):
+            dir_path.mkdir(parents=True, exist_ok=True)
+
+        def extract(member: zipfile.ZipInfo, target_path: Path) -> None:
+            with zip_file.open(member) as source, open(target_path, "wb") as target:
+                if member.file_size > UNZIP_BUFFER_SIZE:
+                    # let the file system allocate big files at once (not worth a
+                    # syscall for small ones, written with a single `write()` anyway)
+                    target.truncate(member.file_size)
+                shutil.copyfileobj(source, target, UNZIP_BUFFER_SIZE)
+
+        # reads of the archive are serialized by `zipfile` itself, but decompression
+        # (zlib releases the GIL) and writing of members run in parallel
+        files = [(m, p) for m, p in zip(members, target_paths) if not m.is_dir()]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(extract, member, path) for member, path in files]
+            for future in futures:
+                future.result()  # re-raise extraction errors
+
+
+def _zip_member_path(destination_dir_path: Path, member_name: str) -> Path:
+    """Get the path a zip archive member should be extracted to.
+
+    Args:
+        destination_dir_path (Path): The path to the directory to extract the files to.
+        member_name (str): The name of the member in the zip archive.
+
+    Raises:
+        ValueError: If the member would be extracted outside of destination directory.
+
+    Returns:
+        Path: The path to extract the member to.
+    """
+    parts = [part for part in member_name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if member_name.startswith(("/", "\\")) or ".." in parts or ":" in member_name:
+        raise ValueError(f"Unsafe path in zip archive: {member_name!r}")
+    return destination_dir_path.joinpath(*parts)
 
 
-def _execute_os_command(command: str, cwd: Union[str, None] = None) -> str:
-    """Execute terminal command.
+def _execute_os_command_quiet(command: List[str], cwd: Union[str, None] = None) -> None:
+    """Execute terminal command discarding its standard output.
+
+    The output is neither captured nor logged, so noisy commands
+    (e.g. `pip install`) do not spend time on it.
+    Only the error output is kept to report a failure.
 
     Args:
-        command (str): The command to execute.
+        command (List[str]): The command to execute and its arguments.
         cwd (Union[str, None], optional):
             The current working directory to execute the command in.
             Defaults to None.
 
     Raises:
-        RuntimeError: If the command failed to execute.
         Exception: If the command failed to execute.
-
-    Returns:
-        str: The output of the command.
     """
-    logger.debug(f"Executing command {command!r}...")
-    process = subprocess.Popen(
+    logger.debug(f"Executing command {command!r} quietly...")
+    process = subprocess.run(
         command,
-        shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         cwd=os.getcwd() if cwd is None else cwd,
+        env={**os.environ, **QUIET_COMMAND_ENV},
     )
-    if process.stdout is None:
-        raise RuntimeError("Failed to execute command: ", command)
-
-    # Poll process for new output until finished
-    while True:
-        nextline = process.stdout.readline().decode("UTF-8")
-        if nextline == "" and process.poll() is not None:
-            break
-        if nextline:
-            # sys.stdout.write(nextline)
-            # sys.stdout.flush()
-            logger.debug(nextline.strip())
-
-    output = process.communicate()[0].decode("UTF-8")
-    exit_code = process.returncode
-
-    if exit_code == 0:
-        logger.debug(output)
-        return output
-    else:
-        raise Exception(command, exit_code, output)
+    if process.returncode != 0:
+        raise Exception(
+            command, process.returncode, process.stderr.decode("UTF-8", errors="replace")
+        )
 
 
 ######################################################################